@@ -1,15 +1,77 @@
-from openai import AsyncOpenAI
 from typing import Dict, List
+import asyncio
 import json
+import logging
+import threading
+import time
+from agents.micro_batcher import MicroBatcher
 import config
 
+logger = logging.getLogger(__name__)
+
 class OpenAIExecutor:
     """Execute tasks using OpenAI API"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._batcher = None
         self.model = config.OPENAI_MODEL
     
+    @property
+    def client(self):
+        """OpenAI client, created on first use so importing this module stays cheap"""
+        # warm_up creates it in a thread: make a concurrent request wait instead of building a second one
+        with self._client_lock:
+            if self._client is None:
+                import httpx
+                from openai import AsyncOpenAI, DEFAULT_TIMEOUT
+                
+                http_client = httpx.AsyncClient(
+                    timeout=DEFAULT_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=100,
+                        max_keepalive_connections=20,
+                        keepalive_expiry=config.OPENAI_KEEPALIVE_EXPIRY
+                    )
+                )
+                self._client = AsyncOpenAI(api_key=config.OPENAI_API_KEY, http_client=http_client)
+        return self._client
+    
+    @property
+    def batcher(self) -> MicroBatcher:
+        """Shared micro-batcher for small structured completions"""
+        if self._batcher is None:
+            self._batcher = MicroBatcher(self.client)
+        return self._batcher
+    
+    async def warm_up(self):
+        """Open a keep-alive connection to the OpenAI API and keep it from idling out"""
+        try:
+            # Importing openai takes a while: do it off the event loop so updates keep flowing
+            client = await asyncio.to_thread(lambda: self.client)
+        except Exception as e:
+            logger.warning(f"OpenAI warm-up failed: {e}")
+            return
+        
+        while True:
+            try:
+                await client.models.list()
+            except Exception as e:
+                logger.warning(f"OpenAI warm-up failed: {e}")
+            await asyncio.sleep(config.OPENAI_KEEPALIVE_REFRESH)
+    
+    def _usage(self, model: str, started: float, response=None, images: int = 0) -> Dict:
+        """Usage report for one OpenAI call, recorded by the orchestrator's ledger"""
+        usage = getattr(response, "usage", None)
+        return {
+            "model": model,
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+            "completion_tokens": getattr(usage, "completion_tokens", 0),
+            "images": images,
+            "latency": time.perf_counter() - started
+        }
+    
     async def execute(self, intent: Dict) -> Dict:
         """Execute intent using OpenAI"""
         
@@ -47,9 +109,12 @@ Provide exactly 5 results in this JSON format:
 
 Make the results realistic and relevant. Include actual product links if possible."""
 
+        model = intent.get("model", self.model)
+        started = time.perf_counter()
+        response = None
         try:
             response = await self.client.chat.completions.create(
-                model=self.model,
+                model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful shopping assistant that provides accurate product search results."},
                     {"role": "user", "content": prompt}
@@ -59,10 +124,11 @@ Make the results realistic and relevant. Include actual product links if possibl
             
             result = json.loads(response.choices[0].message.content)
             result["success"] = True
+            result["usage"] = self._usage(model, started, response)
             return result
             
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return {"success": False, "error": str(e), "usage": self._usage(model, started, response)}
     
     async def _generate_media(self, intent: Dict) -> Dict:
         """Generate media using DALL-E or describe how to generate"""
@@ -71,6 +137,7 @@ Make the results realistic and relevant. Include actual product links if possibl
         prompt = intent.get("prompt", "")
         
         if media_type == "image":
+            started = time.perf_counter()
             try:
                 # Use DALL-E 3 for image generation
                 response = await self.client.images.generate(
@@ -85,10 +152,11 @@ Make the results realistic and relevant. Include actual product links if possibl
                     "success": True,
                     "url": response.data[0].url,
                     "media_type": "image",
-                    "revised_prompt": response.data[0].revised_prompt
+                    "revised_prompt": response.data[0].revised_prompt,
+                    "usage": self._usage("dall-e-3", started, images=1)
                 }
             except Exception as e:
-                return {"success": False, "error": str(e)}
+                return {"success": False, "error": str(e), "usage": self._usage("dall-e-3", started)}
         
         else:
             # For video/audio, provide guidance
@@ -127,25 +195,36 @@ Important:
 - For "every 2 hours" use: "0 */2 * * *"
 """
 
+        model = intent.get("model", self.model)
+        system = "You are a scheduling expert that creates accurate cron expressions."
+        started = time.perf_counter()
+        response = None
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a scheduling expert that creates accurate cron expressions."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
+            if config.MICRO_BATCH_ENABLED:
+                result, usage = await self.batcher.submit(model, system, prompt)
+            else:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"}
+                )
+                result = json.loads(response.choices[0].message.content)
+                usage = self._usage(model, started, response)
             
-            result = json.loads(response.choices[0].message.content)
             result["success"] = True
             result["schedule_id"] = f"reminder-{hash(intent['action'])}"
             result["content"] = f"Reminder: {intent['action']}"
+            result["usage"] = usage
             
             return result
             
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            # Batched failures carry this request's share of the billed batch
+            usage = getattr(e, "usage", None) or self._usage(model, started, response)
+            return {"success": False, "error": str(e), "usage": usage}
     
     async def _store_memory(self, intent: Dict) -> Dict:
         """Store memory (simulated - would use database in production)"""
@@ -166,9 +245,12 @@ Important:
     async def _handle_general_query(self, intent: Dict) -> Dict:
         """Handle general queries with GPT"""
         
+        model = intent.get("model", self.model)
+        started = time.perf_counter()
+        response = None
         try:
             response = await self.client.chat.completions.create(
-                model=self.model,
+                model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant. Provide concise, accurate responses."},
                     {"role": "user", "content": intent.get("message", "")}
@@ -178,8 +260,9 @@ Important:
             return {
                 "success": True,
                 "response": response.choices[0].message.content,
-                "type": "general_response"
+                "type": "general_response",
+                "usage": self._usage(model, started, response)
             }
             
         except Exception as e:
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return {"success": False, "error": str(e), "usage": self._usage(model, started, response)}
\ No newline at end of file
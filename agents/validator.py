@@ -1,5 +1,3 @@
-import validators
-import requests
 from typing import Dict, List
 
 class RigorousValidator:
@@ -26,6 +24,8 @@ class RigorousValidator:
     
     async def _validate_product_search(self, output: Dict, intent: Dict) -> Dict:
         """Validate product search results"""
+        import validators  # deferred: only needed on this path, keeps startup fast
+        
         checks = []
         results = output.get("results", [])
         
@@ -50,6 +50,8 @@ class RigorousValidator:
     
     async def _validate_media_generation(self, output: Dict, intent: Dict) -> Dict:
         """Validate media generation"""
+        import validators
+        
         checks = []
         
         file_url = output.get("url") or output.get("file_url")
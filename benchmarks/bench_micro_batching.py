@@ -0,0 +1,90 @@
+"""Offline load benchmark for micro-batched reminder parsing.
+
+Sends reminder updates from many users through the bot's real Application
+(main.build_application on the offline Bot API transport): update_queue,
+handlers, orchestrator, executor and reply. OpenAI is replaced by a fake
+client that answers after a fixed latency and only serves a limited number
+of requests at once (a stand-in for rate-limit slots). Runs three modes:
+sequential (the default bot: one update at a time), concurrent without
+batching (CONCURRENT_UPDATES) and concurrent with batching
+(MICRO_BATCH_ENABLED), and reports throughput, API requests sent and the
+speedup over the concurrent, unbatched run.
+
+    python benchmarks/bench_micro_batching.py --users 100 --latency 0.2 --slots 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offline import FakeOpenAI, OfflineRequest, make_update
+
+import config
+import main as bot
+from telegram import Update
+
+MODES = [
+    # (name, CONCURRENT_UPDATES, MICRO_BATCH_ENABLED)
+    ("sequential", False, False),
+    ("concurrent", True, False),
+    ("batched", True, True),
+]
+
+async def run(concurrent: bool, batching: bool, users: int, latency: float, slots: int) -> dict:
+    config.CONCURRENT_UPDATES = concurrent
+    config.MICRO_BATCH_ENABLED = batching
+    executor = bot.orchestrator.executor
+    executor._client = FakeOpenAI(latency, slots)
+    executor._batcher = None
+
+    request = OfflineRequest()
+    application = bot.build_application(request=request)
+    updates = [
+        make_update(i, "Remind me to water the plants every Sunday at 6pm", user_id=5000 + i)
+        for i in range(users)
+    ]
+
+    async with application:
+        await application.start()
+        started = time.perf_counter()
+        for update in updates:
+            await application.update_queue.put(Update.de_json(update, application.bot))
+        await application.update_queue.join()
+        elapsed = time.perf_counter() - started
+        await application.stop()
+
+    replies = [parameters for method, parameters in request.sent if method == "sendMessage"]
+    return {
+        "elapsed": elapsed,
+        "requests": executor._client.requests,
+        "succeeded": sum("Reminder Set" in reply.get("text", "") for reply in replies),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--users", type=int, default=100)
+    arg_parser.add_argument("--latency", type=float, default=0.2)
+    arg_parser.add_argument("--slots", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    print(f"{'mode':>10} {'reminders/s':>12} {'API requests':>13} {'requests/min':>13} "
+          f"{'vs concurrent':>14} {'ok':>5}")
+    results = {
+        name: asyncio.run(run(concurrent, batching, args.users, args.latency, args.slots))
+        for name, concurrent, batching in MODES
+    }
+    baseline = args.users / results["concurrent"]["elapsed"]
+    for name, stats in results.items():
+        rate = args.users / stats["elapsed"]
+        print(f"{name:>10} "
+              f"{rate:>12.1f} "
+              f"{stats['requests']:>13} "
+              f"{stats['requests'] / stats['elapsed'] * 60:>13.0f} "
+              f"{rate / baseline:>13.1f}x "
+              f"{stats['succeeded']:>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Offline throughput benchmark for sharded update processing.
+
+Each worker builds the bot's real Application (main.build_application) on an
+offline Bot API transport with a zero-latency fake OpenAI client, and handles
+every update once: Update.de_json, then Application.process_update through
+the handlers, orchestrator, validator and reply formatting. Only the steady
+state is timed: workers are started and initialized first, and the clock
+stops when the last worker reports its shard is done, before shutdown.
+Scaling is bounded by the number of available cores.
+
+    python benchmarks/bench_sharding.py --updates 5000 --max-workers 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offline import FakeOpenAI, OfflineRequest, make_update
+
+def bench_worker(shard_id: int, queue, events):
+    """Worker target: report ready, handle updates until the sentinel, report done"""
+    asyncio.run(_bench_worker(shard_id, queue, events))
+
+async def _bench_worker(shard_id: int, queue, events):
+    import main
+    from telegram import Update
+
+    main.orchestrator.executor._client = FakeOpenAI()
+    application = main.build_application(request=OfflineRequest())
+
+    async with application:
+        events.put(("ready", shard_id))
+        handled = 0
+        while True:
+            data = queue.get()
+            if data is None:
+                break
+            await application.process_update(Update.de_json(data, application.bot))
+            handled += 1
+        events.put(("done", handled))
+
+def run(num_workers: int, updates: list) -> float:
+    """Return steady-state updates/sec for the given number of workers"""
+    from sharding import ShardRouter
+
+    events = multiprocessing.get_context("spawn").Queue()
+    router = ShardRouter(num_workers, bench_worker, (events,))
+    router.start()
+    for _ in range(num_workers):
+        events.get()
+
+    started = time.perf_counter()
+    for update in updates:
+        router.dispatch(update)
+    for queue in router.queues:
+        queue.put(None)
+    handled = sum(events.get()[1] for _ in range(num_workers))
+    elapsed = time.perf_counter() - started
+
+    for process in router.processes:
+        process.join()
+    return handled / elapsed
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--updates", type=int, default=5000)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args()
+
+    ledger = os.environ["USAGE_LEDGER_PATH"]
+    if os.path.exists(ledger):
+        os.remove(ledger)
+
+    updates = [make_update(i) for i in range(args.updates)]
+    baseline = None
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'updates/s':>12} {'speedup':>8}")
+    for num_workers in range(1, args.max_workers + 1):
+        throughput = run(num_workers, updates)
+        baseline = baseline or throughput
+        print(f"{num_workers:>8} {throughput:>12.0f} {throughput / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
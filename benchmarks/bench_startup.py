@@ -0,0 +1,97 @@
+"""Cold start benchmark: import cost of main.py and time to first handled update.
+
+Import cost comes from `python -X importtime -c "import main"`. Time to first
+handled update is measured from launching a fresh interpreter until the bot's
+real Application, started the way run_webhook starts it (initialize, warm-up
+hook, start) on the offline Bot API transport, has fully handled one
+memory-store update and sent its reply. The background OpenAI warm-up points
+at a closed local port, so no request leaves the machine.
+
+    python benchmarks/bench_startup.py --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+FIRST_UPDATE_SNIPPET = """
+import asyncio
+import sys
+
+sys.path.insert(0, {bench_dir!r})
+from offline import OfflineRequest, make_update
+
+import main
+from telegram import Update
+
+async def first_update():
+    request = OfflineRequest()
+    application = main.build_application(request=request)
+    async with application:
+        await main.warm_up(application)
+        await application.start()
+        update = make_update(1, "Remember my favorite color is blue")
+        await application.update_queue.put(Update.de_json(update, application.bot))
+        await application.update_queue.join()
+        assert any(method == "sendMessage" for method, _ in request.sent)
+        print("handled", flush=True)
+        await application.stop()
+
+asyncio.run(first_update())
+"""
+
+def offline_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "offline")
+    env["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1"
+    return env
+
+def import_times(top: int) -> list:
+    """Return (cumulative_us, module) pairs for `import main`, slowest first"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=offline_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def first_update_time() -> float:
+    """Seconds from interpreter launch until the first update is handled"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_UPDATE_SNIPPET.format(bench_dir=BENCH_DIR)],
+        cwd=ROOT, env=offline_env(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    line = process.stdout.readline()
+    elapsed = time.perf_counter() - started
+    process.wait()
+    if line.strip() != "handled":
+        raise RuntimeError("Bot did not handle the first update")
+    return elapsed
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--top", type=int, default=15)
+    args = arg_parser.parse_args()
+
+    print("Slowest imports for `import main` (cumulative):")
+    for cumulative, module in import_times(args.top):
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    samples = [first_update_time() for _ in range(args.runs)]
+    print(f"\nTime to first handled update: median {statistics.median(samples) * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms over {args.runs} runs")
+
+if __name__ == "__main__":
+    main()
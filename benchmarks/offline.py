@@ -0,0 +1,136 @@
+"""Offline stand-ins for the Telegram Bot API and OpenAI used by the benchmarks.
+
+OfflineRequest is a python-telegram-bot transport that answers Bot API calls
+locally, so a real Application (handlers, Update.de_json, process_update) can
+run without a network. FakeOpenAI answers chat, image and model-list calls
+after a configurable latency with a limited number of concurrent slots.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from telegram.request import BaseRequest
+
+# Keep benchmark usage out of the real ledger and away from the daily budget
+os.environ.setdefault("USAGE_LEDGER_PATH", os.path.join(tempfile.gettempdir(), "bench-usage.ledger"))
+os.environ.setdefault("USER_DAILY_BUDGET_USD", "1000000")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+MESSAGES = [
+    "Find wireless headphones on Amazon",
+    "Generate an image of a sunset over the sea",
+    "Remind me to call mom every Sunday at 6pm",
+    "Remember my favorite color is blue",
+    "What's the capital of France?",
+]
+
+CRON_RESULT = {
+    "cron_expression": "0 18 * * 0",
+    "next_execution": "Sunday at 6pm",
+    "recurring": True,
+    "description": "Weekly reminder"
+}
+
+PRODUCT_RESULT = {
+    "name": "Headphones",
+    "price": "$99",
+    "link": "https://example.com/product",
+    "description": "Wireless"
+}
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+def make_update(update_id: int, text: str = None, user_id: int = None) -> dict:
+    """Build a raw Telegram update like the webhook receives"""
+    user_id = user_id or 1000 + update_id % 997
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+            "text": text or MESSAGES[update_id % len(MESSAGES)],
+        },
+    }
+
+class OfflineRequest(BaseRequest):
+    """Bot API transport that answers every call locally"""
+
+    def __init__(self):
+        self.sent = []  # (method, parameters) of every call
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        api_method = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        self.sent.append((api_method, parameters))
+
+        if api_method == "getMe":
+            result = BOT_USER
+        elif api_method.startswith("send"):
+            result = {
+                "message_id": len(self.sent),
+                "date": int(time.time()),
+                "chat": {"id": parameters.get("chat_id", 0), "type": "private"},
+                "from": BOT_USER,
+                "text": parameters.get("text", ""),
+            }
+        else:
+            result = True
+
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+class FakeOpenAI:
+    """AsyncOpenAI stand-in with fixed latency and limited concurrency"""
+
+    def __init__(self, latency: float = 0.0, slots: int = 1000):
+        self.latency = latency
+        self.slots = asyncio.Semaphore(slots)
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.images = SimpleNamespace(generate=self.generate)
+        self.models = SimpleNamespace(list=self.list_models)
+
+    async def _call(self):
+        async with self.slots:
+            self.requests += 1
+            await asyncio.sleep(self.latency)
+
+    async def create(self, model, messages, **kwargs):
+        await self._call()
+        content = json.dumps(self._answer(messages)) if "response_format" in kwargs else "Paris."
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=250, completion_tokens=60)
+        )
+
+    async def generate(self, **kwargs):
+        await self._call()
+        image = SimpleNamespace(url="https://example.com/image.png", revised_prompt=kwargs.get("prompt"))
+        return SimpleNamespace(data=[image])
+
+    async def list_models(self):
+        await self._call()
+        return SimpleNamespace(data=[])
+
+    def _answer(self, messages) -> dict:
+        from agents.micro_batcher import BATCH_INSTRUCTIONS
+
+        system = messages[0]["content"]
+        content = messages[-1]["content"]
+        if content.startswith(BATCH_INSTRUCTIONS):
+            requests = json.loads(content[len(BATCH_INSTRUCTIONS):])
+            return {"results": [dict(CRON_RESULT, id=request["id"]) for request in requests]}
+        if "scheduling" in system:
+            return CRON_RESULT
+        return {"results": [PRODUCT_RESULT] * 5}
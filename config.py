@@ -9,6 +9,8 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "8209802088:AAGNMKwwhLBC7HI
 # OpenAI API
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
+OPENAI_KEEPALIVE_EXPIRY = 120  # seconds an idle pooled connection is kept open
+OPENAI_KEEPALIVE_REFRESH = 90  # seconds between warm-up pings; must stay below the expiry
 
 # Validation Settings
 VALIDATION_MODE = "RIGOROUS"
@@ -20,4 +22,42 @@ AGENT_TIMEOUT = 60  # seconds
 VALIDATION_TIMEOUT = 30  # seconds
 
 # User Timezone
-USER_TIMEZONE = "Europe/Kiev"
\ No newline at end of file
+USER_TIMEZONE = "Europe/Kiev"
+
+# Horizontal Scaling
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))  # >1 enables sharded webhook mode
+WORKER_MAX_RESTARTS = 5  # per worker; after that the front process exits non-zero
+
+
+# Usage Accounting & Budgets
+USAGE_LEDGER_PATH = os.getenv("USAGE_LEDGER_PATH", "usage.ledger")
+USAGE_RETENTION_DAYS = 7  # days of aggregates kept in memory for /usage
+USER_DAILY_BUDGET_USD = float(os.getenv("USER_DAILY_BUDGET_USD", "1.00"))
+BUDGET_DOWNGRADE_RATIO = 0.8  # share of budget after which OPENAI_BUDGET_MODEL is used
+OPENAI_BUDGET_MODEL = os.getenv("OPENAI_BUDGET_MODEL", "gpt-3.5-turbo")
+
+# Estimated prices: USD per 1K (prompt, completion) tokens, USD per image
+MODEL_PRICES = {
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+}
+IMAGE_PRICES = {
+    "dall-e-3": 0.04,
+}
+# Used for models missing above, so unknown models still count against budgets
+DEFAULT_MODEL_PRICE = (0.03, 0.06)
+DEFAULT_IMAGE_PRICE = 0.08
+
+
+# Concurrent update handling: different users at once, each user's updates in order
+CONCURRENT_UPDATES = os.getenv("CONCURRENT_UPDATES", "false").lower() == "true"
+MAX_CONCURRENT_UPDATES = 256
+
+# Micro-batching of small structured completions (reminder parsing); implies CONCURRENT_UPDATES
+MICRO_BATCH_ENABLED = os.getenv("MICRO_BATCH_ENABLED", "false").lower() == "true"
+MICRO_BATCH_WINDOW = 0.03  # seconds to collect requests before sending
+MICRO_BATCH_MAX_SIZE = 16  # send immediately once this many are waiting
@@ -1,9 +1,14 @@
 import asyncio
 import logging
 import os
-from telegram import Update
+import signal
+import sys
+from telegram import Bot, Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.request import BaseRequest
 from orchestrator import Orchestrator
+from sharding import ShardRouter
+from update_processor import PerUserUpdateProcessor
 import config
 
 logging.basicConfig(
@@ -13,6 +18,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 orchestrator = Orchestrator()
+_background_tasks = set()
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command"""
@@ -23,7 +29,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• 🎨 Image generation: 'Generate an image of a sunset'\n"
         "• ⏰ Reminders: 'Remind me to call mom at 6pm'\n"
         "• 💾 Memory: 'Remember my favorite color is blue'\n"
-        "• 💬 General questions: Ask me anything!\n\n"
+        "• 💬 General questions: Ask me anything!\n"
+        "• 📊 /usage: your OpenAI usage and budget\n\n"
         "Powered by GPT-4 with rigorous validation!",
         parse_mode="Markdown"
     )
@@ -112,10 +119,133 @@ async def format_and_send_output(update: Update, output: dict, result: dict):
     else:
         await update.message.reply_text(str(output))
 
+async def usage(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Report OpenAI usage and estimated cost for the user"""
+    summary = orchestrator.ledger.summary(update.effective_user.id)
+    today = summary["today"]
+    window = summary["window"]
+    
+    message = (
+        f"📊 **Usage Today**\n\n"
+        f"💰 ${today['cost']:.4f} of ${summary['budget']:.2f} daily budget\n"
+        f"📞 {today['calls']} calls, {today['images']} images\n"
+        f"🔤 {today['prompt_tokens']} prompt + {today['completion_tokens']} completion tokens\n"
+    )
+    if today["calls"]:
+        message += f"⏱ Avg latency: {today['latency'] / today['calls']:.1f}s\n"
+    
+    for intent_type, cost in today["cost_by_intent"].most_common():
+        message += f"   • `{intent_type}`: ${cost:.4f}\n"
+    
+    message += (
+        f"\n📅 **Last {summary['days']} days:** ${window['cost']:.4f}, "
+        f"{window['calls']} calls\n"
+    )
+    for model, cost in window["cost_by_model"].most_common():
+        message += f"   • `{model}`: ${cost:.4f}\n"
+    
+    await update.message.reply_text(message, parse_mode="Markdown")
+
 async def health_check(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Health check endpoint"""
     await update.message.reply_text("✅ Bot is running!")
 
+async def warm_up(application: Application):
+    """Warm and keep refreshing connection pools in the background once the bot is initialized"""
+    # Not awaited: the webhook listener / polling starts without waiting on OpenAI
+    task = asyncio.create_task(orchestrator.executor.warm_up())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def cool_down(application: Application):
+    """Stop background tasks such as the keep-alive refresh"""
+    for task in list(_background_tasks):
+        task.cancel()
+
+def build_application(request: BaseRequest = None) -> Application:
+    """Build the Telegram application with all handlers"""
+    builder = (
+        Application.builder()
+        .token(config.TELEGRAM_BOT_TOKEN)
+        .post_init(warm_up)
+        .post_shutdown(cool_down)
+    )
+    if config.CONCURRENT_UPDATES or config.MICRO_BATCH_ENABLED:
+        # Batching needs several users' updates in flight at once; each user's own
+        # updates still run one at a time, keeping their order and budget checks
+        builder = builder.concurrent_updates(PerUserUpdateProcessor(config.MAX_CONCURRENT_UPDATES))
+    if request is not None:
+        # Custom Bot API transport, e.g. the offline one used by benchmarks
+        builder = builder.request(request)
+    application = builder.build()
+    
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("health", health_check))
+    application.add_handler(CommandHandler("usage", usage))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    
+    return application
+
+def run_worker(shard_id: int, queue):
+    """Worker process entry point: handle updates routed to this shard"""
+    asyncio.run(_worker_loop(shard_id, queue))
+
+async def _worker_loop(shard_id: int, queue):
+    """Feed updates from the shard queue into a local application"""
+    application = build_application()
+    loop = asyncio.get_running_loop()
+    
+    async with application:
+        await application.start()
+        # post_init/post_shutdown only run under run_polling/run_webhook, so call them here
+        await warm_up(application)
+        logger.info(f"Worker {shard_id} ready")
+        
+        while True:
+            data = await loop.run_in_executor(None, queue.get)
+            if data is None:
+                break
+            await application.update_queue.put(Update.de_json(data, application.bot))
+        
+        await application.stop()
+        await cool_down(application)
+
+def run_sharded(port: int, webhook_url: str):
+    """Receive webhooks in this process and shard updates across workers"""
+    from aiohttp import web
+    
+    router = ShardRouter(config.WORKER_PROCESSES, run_worker)
+    router.start()
+    failed = False
+    
+    async def receive_update(request):
+        nonlocal failed
+        try:
+            router.dispatch(await request.json())
+        except RuntimeError as e:
+            # A worker keeps crashing: stop, and exit non-zero below so the platform restarts us
+            logger.error(f"Shard worker failed: {e}")
+            failed = True
+            os.kill(os.getpid(), signal.SIGTERM)
+            return web.Response(status=500)
+        return web.Response()
+    
+    async def register_webhook(app):
+        async with Bot(config.TELEGRAM_BOT_TOKEN) as bot:
+            await bot.set_webhook(f"https://{webhook_url}/{config.TELEGRAM_BOT_TOKEN}")
+    
+    app = web.Application()
+    app.router.add_post(f"/{config.TELEGRAM_BOT_TOKEN}", receive_update)
+    app.on_startup.append(register_webhook)
+    
+    try:
+        web.run_app(app, host="0.0.0.0", port=port)
+    finally:
+        router.stop(timeout=10)
+    
+    if failed:
+        sys.exit(1)
+
 def main():
     """Start the bot"""
     if not config.OPENAI_API_KEY:
@@ -126,11 +256,14 @@ def main():
     port = os.getenv("PORT")
     webhook_url = os.getenv("RAILWAY_PUBLIC_DOMAIN") or os.getenv("RAILWAY_STATIC_URL")
     
-    application = Application.builder().token(config.TELEGRAM_BOT_TOKEN).build()
+    if port and webhook_url and config.WORKER_PROCESSES > 1:
+        # Sharded webhook mode: one front process, N workers keyed by user
+        logger.info(f"Starting bot in SHARDED WEBHOOK mode on port {port} "
+                    f"with {config.WORKER_PROCESSES} workers")
+        run_sharded(int(port), webhook_url)
+        return
     
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("health", health_check))
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    application = build_application()
     
     if port and webhook_url:
         # Webhook mode for Railway
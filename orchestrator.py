@@ -3,6 +3,7 @@ from parsers.intent_parser import IntentParser
 from agents.router import AgentRouter
 from agents.validator import RigorousValidator
 from agents.openai_executor import OpenAIExecutor
+from usage_ledger import UsageLedger
 import config
 
 class Orchestrator:
@@ -13,8 +14,16 @@ class Orchestrator:
         self.router = AgentRouter()
         self.validator = RigorousValidator()
         self.executor = OpenAIExecutor()
+        self._ledger = None
         self.max_retries = config.MAX_RETRIES
     
+    @property
+    def ledger(self) -> UsageLedger:
+        """Usage ledger, opened on first use so importing main touches no files"""
+        if self._ledger is None:
+            self._ledger = UsageLedger()
+        return self._ledger
+    
     async def process(self, message: str, user_id: str, notify_callback) -> Dict:
         """Main orchestration flow"""
         
@@ -26,6 +35,20 @@ class Orchestrator:
             intent["type"] = "GENERAL_QUERY"
             intent["message"] = message
         
+        # Enforce per-user daily budget
+        spent = self.ledger.spent_today(user_id)
+        budget = config.USER_DAILY_BUDGET_USD
+        
+        if spent >= budget:
+            return {
+                "success": False,
+                "message": f"Daily budget of ${budget:.2f} reached. Try again tomorrow or check /usage."
+            }
+        
+        if spent >= budget * config.BUDGET_DOWNGRADE_RATIO:
+            intent["model"] = config.OPENAI_BUDGET_MODEL
+            await notify_callback(f"💸 Close to your daily budget, using **{intent['model']}**")
+        
         # Execute with retries
         for attempt in range(1, self.max_retries + 1):
             agent_id = self.router.select_agent(intent, attempt)
@@ -42,6 +65,7 @@ class Orchestrator:
             # Execute with OpenAI
             await notify_callback("⚙️ Executing...")
             output = await self.executor.execute(intent)
+            self.ledger.record(user_id, intent["type"], output.pop("usage", None))
             
             if not output.get("success", False):
                 if attempt < self.max_retries:
@@ -0,0 +1,82 @@
+import logging
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+class ShardRouter:
+    """Route raw Telegram updates to worker processes by user"""
+
+    def __init__(self, num_shards: int, worker_target: Callable, worker_args: tuple = (),
+                 max_restarts: int = None):
+        # spawn keeps each worker free of the parent's event loop and HTTP clients
+        self._context = multiprocessing.get_context("spawn")
+        self._worker_target = worker_target
+        self._worker_args = worker_args
+        self.num_shards = num_shards
+        self.max_restarts = config.WORKER_MAX_RESTARTS if max_restarts is None else max_restarts
+        self.restarts = [0] * num_shards
+        self.queues: List = [self._context.Queue() for _ in range(num_shards)]
+        self.processes = [self._spawn(shard_id) for shard_id in range(num_shards)]
+
+    def start(self):
+        """Start all worker processes"""
+        for process in self.processes:
+            process.start()
+
+    def dispatch(self, update: Dict) -> int:
+        """Send update to its user's shard, preserving per-user order"""
+        shard_id = shard_for(update, self.num_shards)
+        self.ensure_alive(shard_id)
+        self.queues[shard_id].put(update)
+        return shard_id
+
+    def ensure_alive(self, shard_id: int):
+        """Respawn a dead worker; raise RuntimeError once it has died too often"""
+        process = self.processes[shard_id]
+        if process.is_alive():
+            return
+
+        if self.restarts[shard_id] >= self.max_restarts:
+            raise RuntimeError(
+                f"Worker {shard_id} died {self.restarts[shard_id] + 1} times "
+                f"(exit code {process.exitcode})"
+            )
+
+        self.restarts[shard_id] += 1
+        logger.warning(f"Worker {shard_id} died (exit code {process.exitcode}), respawning")
+        # A worker killed mid-get can leave its queue's lock held: start on a fresh one
+        self.queues[shard_id] = self._context.Queue()
+        self.processes[shard_id] = self._spawn(shard_id)
+        self.processes[shard_id].start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Drain queues and wait for workers to exit"""
+        for queue in self.queues:
+            queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+
+    def _spawn(self, shard_id: int):
+        return self._context.Process(
+            target=self._worker_target,
+            args=(shard_id, self.queues[shard_id]) + self._worker_args,
+            daemon=True
+        )
+
+def shard_for(update: Dict, num_shards: int) -> int:
+    """Pick a stable shard for the update's sender"""
+    user_id = _extract_user_id(update)
+    if user_id is None:
+        return 0
+    return user_id % num_shards
+
+def _extract_user_id(update: Dict) -> Optional[int]:
+    """Find the sender id in a raw update (message, callback_query, ...)"""
+    for value in update.values():
+        if isinstance(value, dict):
+            sender = value.get("from") or value.get("user") or {}
+            if "id" in sender:
+                return int(sender["id"])
+    return None
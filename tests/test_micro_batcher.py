@@ -0,0 +1,63 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from agents.micro_batcher import BATCH_INSTRUCTIONS, BatchItemError, MicroBatcher
+
+class FakeClient:
+    """Chat client that answers a batch with the given per-id results"""
+
+    def __init__(self, results=None, content=None, tokens=(30, 9)):
+        self.content = content or json.dumps({"results": results})
+        self.tokens = tokens
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        assert messages[-1]["content"].startswith(BATCH_INSTRUCTIONS)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=SimpleNamespace(prompt_tokens=self.tokens[0], completion_tokens=self.tokens[1])
+        )
+
+async def submit_all(batcher, count):
+    return await asyncio.gather(
+        *(batcher.submit("model", "system", f"request {i}") for i in range(count)),
+        return_exceptions=True
+    )
+
+def test_string_ids_are_matched():
+    client = FakeClient([{"id": "1", "value": "b"}, {"id": "0", "value": "a"}])
+    batcher = MicroBatcher(client, window=0.01, max_size=16)
+
+    outcomes = asyncio.run(submit_all(batcher, 2))
+
+    assert [result for result, _ in outcomes] == [{"value": "a"}, {"value": "b"}]
+
+def test_bad_ids_only_fail_their_own_caller():
+    client = FakeClient([{"id": 0, "value": "a"}, {"id": "one", "value": "b"}, {"value": "c"}])
+    batcher = MicroBatcher(client, window=0.01, max_size=16)
+
+    outcomes = asyncio.run(submit_all(batcher, 3))
+
+    assert outcomes[0][0] == {"value": "a"}
+    assert isinstance(outcomes[1], BatchItemError)
+    assert isinstance(outcomes[2], BatchItemError)
+
+def test_usage_is_fully_shared_including_failed_items():
+    client = FakeClient([{"id": 0, "value": "a"}, {"id": 1, "error": "bad"}])
+    batcher = MicroBatcher(client, window=0.01, max_size=16)
+
+    outcomes = asyncio.run(submit_all(batcher, 3))
+
+    usages = [outcomes[0][1], outcomes[1].usage, outcomes[2].usage]
+    assert sum(usage["prompt_tokens"] for usage in usages) == 30
+    assert sum(usage["completion_tokens"] for usage in usages) == 9
+
+def test_unparseable_batch_still_reports_usage():
+    client = FakeClient(content="not json", tokens=(31, 10))
+    batcher = MicroBatcher(client, window=0.01, max_size=16)
+
+    outcomes = asyncio.run(submit_all(batcher, 2))
+
+    assert [error.usage["prompt_tokens"] for error in outcomes] == [16, 15]
+    assert [error.usage["completion_tokens"] for error in outcomes] == [5, 5]
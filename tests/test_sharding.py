@@ -0,0 +1,40 @@
+import pytest
+
+from sharding import ShardRouter, _extract_user_id, shard_for
+
+def message_update(user_id):
+    return {"update_id": 1, "message": {"message_id": 1, "from": {"id": user_id}, "text": "hi"}}
+
+def exit_immediately(shard_id, queue):
+    """Worker target that dies straight away"""
+
+def test_message_sender_is_extracted():
+    assert _extract_user_id(message_update(42)) == 42
+
+def test_callback_query_sender_is_extracted():
+    update = {"update_id": 2, "callback_query": {"id": "abc", "from": {"id": 7}, "data": "x"}}
+    assert _extract_user_id(update) == 7
+
+def test_update_without_sender_goes_to_shard_zero():
+    update = {"update_id": 3, "channel_post": {"message_id": 1, "chat": {"id": -100}}}
+    assert _extract_user_id(update) is None
+    assert shard_for(update, 4) == 0
+
+def test_mapping_is_stable_per_user():
+    shards = {shard_for(message_update(user_id), 4) for user_id in (5, 5, 5)}
+    assert shards == {5 % 4}
+    assert shard_for(message_update(5), 4) == shard_for(
+        {"update_id": 9, "edited_message": {"from": {"id": 5}}}, 4
+    )
+
+def test_dead_worker_is_respawned_until_max_restarts():
+    router = ShardRouter(1, exit_immediately, max_restarts=1)
+    router.start()
+    router.processes[0].join(10)
+
+    router.dispatch(message_update(1))
+    assert router.restarts == [1]
+
+    router.processes[0].join(10)
+    with pytest.raises(RuntimeError):
+        router.dispatch(message_update(1))
@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+from update_processor import PerUserUpdateProcessor
+
+def update_from(user_id):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id))
+
+async def run_updates(user_ids):
+    """Process one 10 ms update per user id; return (user_id, event) in the order they happened"""
+    processor = PerUserUpdateProcessor(16)
+    events = []
+
+    async def handle(index, user_id):
+        events.append((user_id, f"start {index}"))
+        await asyncio.sleep(0.01)
+        events.append((user_id, f"end {index}"))
+
+    await asyncio.gather(*(
+        processor.process_update(update_from(user_id), handle(index, user_id))
+        for index, user_id in enumerate(user_ids)
+    ))
+    return processor, events
+
+def test_same_user_updates_run_in_order():
+    _, events = asyncio.run(run_updates([1, 1, 1]))
+
+    assert [event for _, event in events] == [
+        "start 0", "end 0", "start 1", "end 1", "start 2", "end 2"
+    ]
+
+def test_different_users_run_concurrently():
+    _, events = asyncio.run(run_updates([1, 2]))
+
+    assert [event for _, event in events[:2]] == ["start 0", "start 1"]
+
+def test_idle_users_are_forgotten():
+    processor, _ = asyncio.run(run_updates([1, 2, 1]))
+
+    assert processor._locks == {}
+
+def test_updates_without_user_are_not_serialized():
+    processor = PerUserUpdateProcessor(4)
+    done = []
+
+    async def handle():
+        done.append(True)
+
+    asyncio.run(processor.process_update(SimpleNamespace(effective_user=None), handle()))
+    assert done == [True]
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import config
+from orchestrator import Orchestrator
+from usage_ledger import RECORD, REPLAY_CHUNK, UsageLedger, estimate_cost
+
+GPT4_CALL = {"model": "gpt-4", "prompt_tokens": 10000, "completion_tokens": 0, "latency": 1.0}  # $0.30
+
+def test_replay_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "usage.ledger")
+    ledger = UsageLedger(path=path)
+    for _ in range(3):
+        ledger.record(1, "GENERAL_QUERY", GPT4_CALL)
+    with open(path, "ab") as log:
+        log.write(b"\x01" * 7)
+
+    ledger = UsageLedger(path=path)
+    ledger.record(1, "GENERAL_QUERY", GPT4_CALL)
+
+    assert os.path.getsize(path) == 4 * RECORD.size
+    assert UsageLedger(path=path).summary(1)["today"]["calls"] == 4
+
+def test_records_older_than_window_are_skipped(tmp_path):
+    path = str(tmp_path / "usage.ledger")
+    now = time.time()
+    old = RECORD.pack(now - 30 * 86400, 1, 0, 2, 10, 10, 0, 1.0, 5.0)
+    recent = RECORD.pack(now, 1, 0, 2, 10, 10, 0, 1.0, 0.25)
+    with open(path, "wb") as log:
+        # More old records than one replay chunk, so the backward walk crosses chunks
+        log.write(old * (REPLAY_CHUNK // RECORD.size + 100))
+        log.write(recent * 2)
+
+    summary = UsageLedger(path=path, retention_days=7).summary(1)
+
+    assert summary["window"]["calls"] == 2
+    assert summary["today"]["cost"] == 0.5
+
+def test_buckets_roll_out_after_midnight(tmp_path):
+    ledger = UsageLedger(path=str(tmp_path / "usage.ledger"), retention_days=2)
+    ledger.record(1, "GENERAL_QUERY", GPT4_CALL)
+    today = ledger._today()
+
+    ledger._today = lambda: today + timedelta(days=2)
+
+    assert ledger.summary(1)["window"]["calls"] == 0
+    assert ledger.spent_today(1) == 0.0
+
+def test_unknown_model_uses_default_price(tmp_path, monkeypatch, caplog):
+    prompt_price, completion_price = config.DEFAULT_MODEL_PRICE
+    assert estimate_cost("no-such-model", 1000, 1000, 0) == prompt_price + completion_price
+    assert estimate_cost("no-such-image-model", 0, 0, 2) == 2 * config.DEFAULT_IMAGE_PRICE
+
+    monkeypatch.setattr(config, "OPENAI_MODEL", "no-such-model")
+    with caplog.at_level(logging.WARNING):
+        UsageLedger(path=str(tmp_path / "usage.ledger"))
+    assert "no-such-model" in caplog.text
+
+class FakeClient:
+    """Chat client that records which model each call used"""
+
+    def __init__(self):
+        self.models = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        self.models.append(model)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Paris."))],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0)
+        )
+
+def test_budget_downgrades_then_refuses(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "USER_DAILY_BUDGET_USD", 1.0)
+    monkeypatch.setattr(config, "BUDGET_DOWNGRADE_RATIO", 0.8)
+    monkeypatch.setattr(config, "OPENAI_MODEL", "gpt-4-turbo-preview")
+    monkeypatch.setattr(config, "OPENAI_BUDGET_MODEL", "gpt-3.5-turbo")
+
+    orchestrator = Orchestrator()
+    orchestrator._ledger = UsageLedger(path=str(tmp_path / "usage.ledger"))
+    client = FakeClient()
+    orchestrator.executor._client = client
+    notes = []
+
+    async def notify(text):
+        notes.append(text)
+
+    def ask():
+        return asyncio.run(orchestrator.process("What's the capital of France?", 1, notify))
+
+    # Below the downgrade ratio: configured model
+    assert ask()["success"]
+    assert client.models == ["gpt-4-turbo-preview"]
+
+    # $0.90 of $1.00: cheaper model
+    for _ in range(3):
+        orchestrator.ledger.record(1, "GENERAL_QUERY", GPT4_CALL)
+    assert ask()["success"]
+    assert client.models[-1] == "gpt-3.5-turbo"
+    assert any("budget" in note for note in notes)
+
+    # $1.20 of $1.00: refused without calling OpenAI
+    orchestrator.ledger.record(1, "GENERAL_QUERY", GPT4_CALL)
+    result = ask()
+    assert not result["success"]
+    assert "budget" in result["message"]
+    assert len(client.models) == 2
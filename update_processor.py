@@ -0,0 +1,36 @@
+import asyncio
+from typing import Any, Awaitable, Dict
+from telegram.ext import BaseUpdateProcessor
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Run different users' updates concurrently, but each user's updates in order"""
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._waiting: Dict[int, int] = {}  # user_id -> updates holding or awaiting the lock
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        user = getattr(update, "effective_user", None)
+        if user is None:
+            await coroutine
+            return
+
+        user_id = user.id
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._waiting[user_id] = self._waiting.get(user_id, 0) + 1
+        try:
+            async with lock:
+                await coroutine
+        finally:
+            # Forget idle users so the lock table doesn't grow with every user ever seen
+            self._waiting[user_id] -= 1
+            if not self._waiting[user_id]:
+                del self._waiting[user_id]
+                del self._locks[user_id]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
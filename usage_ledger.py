@@ -0,0 +1,187 @@
+import logging
+import os
+import struct
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+import config
+
+logger = logging.getLogger(__name__)
+
+# Codes are written to the log: only ever append to these tuples
+INTENT_CODES = ("PRODUCT_SEARCH", "MEDIA_GENERATION", "REMINDER", "MEMORY_STORE", "GENERAL_QUERY")
+MODEL_CODES = ("gpt-4-turbo-preview", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo", "dall-e-3",
+               "gpt-4o", "gpt-4o-mini")
+UNKNOWN_CODE = 255
+
+# timestamp, user_id, intent, model, prompt_tokens, completion_tokens, images, latency_s, cost_usd
+RECORD = struct.Struct("<dqBBIIHff")
+REPLAY_CHUNK = RECORD.size * 4096
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, images: int) -> float:
+    """Estimate USD cost of one call from config prices"""
+    prompt_price, completion_price = config.MODEL_PRICES.get(model, config.DEFAULT_MODEL_PRICE)
+    cost = prompt_tokens / 1000 * prompt_price + completion_tokens / 1000 * completion_price
+    if images:
+        cost += images * config.IMAGE_PRICES.get(model, config.DEFAULT_IMAGE_PRICE)
+    return cost
+
+def _empty_bucket() -> Dict:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "images": 0,
+        "latency": 0.0,
+        "cost": 0.0,
+        "cost_by_intent": Counter(),
+        "cost_by_model": Counter(),
+    }
+
+class UsageLedger:
+    """Append-only binary log of OpenAI usage with rolling per-user daily aggregates"""
+
+    def __init__(self, path: str = None, retention_days: int = None):
+        self.path = path or config.USAGE_LEDGER_PATH
+        self.retention_days = retention_days or config.USAGE_RETENTION_DAYS
+        self.timezone = ZoneInfo(config.USER_TIMEZONE)
+        self._daily = defaultdict(_empty_bucket)  # (day, user_id) -> bucket
+        self._check_prices()
+        self._window_start = self._today() - timedelta(days=self.retention_days - 1)
+        self._replay()
+        # Unbuffered append: each record is one write, so shard workers can share the file
+        self._log = open(self.path, "ab", buffering=0)
+
+    def record(self, user_id, intent_type: str, usage: Optional[Dict]):
+        """Record one OpenAI call reported by the executor"""
+        if not usage:
+            return
+
+        model = usage.get("model", "")
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        images = usage.get("images", 0)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, images)
+
+        entry = (
+            time.time(),
+            int(user_id),
+            _code(INTENT_CODES, intent_type),
+            _code(MODEL_CODES, model),
+            prompt_tokens,
+            completion_tokens,
+            images,
+            usage.get("latency", 0.0),
+            cost,
+        )
+        self._log.write(RECORD.pack(*entry))
+        self._roll()
+        self._aggregate(*entry)
+
+    def spent_today(self, user_id) -> float:
+        """Estimated USD spent by the user today"""
+        key = (self._today(), int(user_id))
+        return self._daily[key]["cost"] if key in self._daily else 0.0
+
+    def summary(self, user_id) -> Dict:
+        """Aggregates for today and the whole retention window"""
+        user_id = int(user_id)
+        today = self._today()
+        window = _empty_bucket()
+        self._roll()
+
+        for (day, bucket_user), bucket in self._daily.items():
+            if bucket_user == user_id:
+                _merge(window, bucket)
+
+        return {
+            "today": self._daily.get((today, user_id), _empty_bucket()),
+            "window": window,
+            "days": self.retention_days,
+            "budget": config.USER_DAILY_BUDGET_USD,
+        }
+
+    def _aggregate(self, timestamp, user_id, intent_code, model_code,
+                   prompt_tokens, completion_tokens, images, latency, cost):
+        """Add one record to the rolling aggregates"""
+        try:
+            day = datetime.fromtimestamp(timestamp, self.timezone).date()
+        except (OverflowError, OSError, ValueError):
+            return  # undecodable timestamp in a damaged log
+        if not self._window_start <= day <= self._today():
+            return
+
+        bucket = self._daily[(day, user_id)]
+        bucket["calls"] += 1
+        bucket["prompt_tokens"] += prompt_tokens
+        bucket["completion_tokens"] += completion_tokens
+        bucket["images"] += images
+        bucket["latency"] += latency
+        bucket["cost"] += cost
+        bucket["cost_by_intent"][_name(INTENT_CODES, intent_code)] += cost
+        bucket["cost_by_model"][_name(MODEL_CODES, model_code)] += cost
+
+    def _check_prices(self):
+        """Warn about configured models that fall back to the default price"""
+        for model in (config.OPENAI_MODEL, config.OPENAI_BUDGET_MODEL):
+            if model not in config.MODEL_PRICES:
+                logger.warning(
+                    f"No price for model {model} in MODEL_PRICES, "
+                    f"using default {config.DEFAULT_MODEL_PRICE} USD per 1K tokens"
+                )
+
+    def _roll(self):
+        """Drop buckets that fell out of the retention window after midnight"""
+        window_start = self._today() - timedelta(days=self.retention_days - 1)
+        if window_start == self._window_start:
+            return
+
+        self._window_start = window_start
+        for key in [key for key in self._daily if key[0] < window_start]:
+            del self._daily[key]
+
+    def _replay(self):
+        """Rebuild aggregates from the log on startup, reading only the retention window"""
+        if not os.path.exists(self.path):
+            return
+
+        window_start = datetime.combine(self._window_start, datetime.min.time(), self.timezone).timestamp()
+        chunks = []
+
+        with open(self.path, "r+b") as log:
+            size = log.seek(0, os.SEEK_END)
+            # Drop a partial trailing record left by a crash mid-write, so the
+            # records appended after it stay aligned
+            end = size - size % RECORD.size
+            if end != size:
+                log.truncate(end)
+
+            # Records are appended in time order: walk back from the end until
+            # a chunk starts before the window
+            while end > 0:
+                start = max(0, end - REPLAY_CHUNK)
+                log.seek(start)
+                chunk = log.read(end - start)
+                chunks.append(chunk)
+                end = start
+                if RECORD.unpack_from(chunk)[0] < window_start:
+                    break
+
+        for chunk in reversed(chunks):
+            for entry in RECORD.iter_unpack(chunk):
+                self._aggregate(*entry)
+
+    def _today(self) -> date:
+        return datetime.now(self.timezone).date()
+
+def _code(names: tuple, name: str) -> int:
+    return names.index(name) if name in names else UNKNOWN_CODE
+
+def _name(names: tuple, code: int) -> str:
+    return names[code] if code < len(names) else "other"
+
+def _merge(target: Dict, bucket: Dict):
+    for key, value in bucket.items():
+        target[key] += value